@@ -13,46 +13,22 @@ Functions:
   for knowledge-based question answering.
 """
 
+from typing import TYPE_CHECKING, Optional
 from langchain.agents import AgentExecutor, create_react_agent
 from langchain_core.prompts import PromptTemplate
 from app.models.llm import get_llm
-from app.config import settings
 from app.agent.tools import KnowledgeSearchTool, WipeVectorStoreTool
 from app.core.vector_store import VectorStore
 from app.models.embedder import Embedder
 
+if TYPE_CHECKING:
+    from app.models.reranker import Reranker
 
-def create_rag_agent(llm, embedder: Embedder, vector_store: VectorStore) -> AgentExecutor:
-    """Initializes and returns a ReAct agent for document interaction.
-
-    Creates an efficient agent that aims to provide answers in a single iteration
-    when possible, using a custom prompt that encourages direct responses.
-
-    Args:
-        llm: An initialized LangChain compatible language model instance.
-        embedder: An instance of the Embedder class for vectorizing queries.
-        vector_store: An instance of the VectorStore class for document retrieval.
-
-    Returns:
-        An AgentExecutor instance optimized for direct responses.
-
-    Raises:
-        ValueError: If the prompt template is missing required variables.
-    """
-    # Initialize tools with clear, focused descriptions
-    tools = [
-        KnowledgeSearchTool(
-            llm=llm,
-            embedder=embedder,
-            vector_store=vector_store
-        ),
-        WipeVectorStoreTool(
-            vector_store=vector_store
-        )
-    ]
 
-    # Custom prompt that balances efficiency with thoroughness
-    prompt = PromptTemplate.from_template("""You are an intelligent assistant focused on providing complete and accurate answers efficiently.
+# Custom prompt that balances efficiency with thoroughness. Everything before
+# the final question is identical across requests (the tool descriptions are
+# bound once when the agent is built), so the provider can reuse the prefix.
+REACT_PROMPT = PromptTemplate.from_template("""You are an intelligent assistant focused on providing complete and accurate answers efficiently.
 
 CRITICAL FORMATTING RULES:
 1. After EACH tool use, you MUST provide a Thought and Final Answer
@@ -83,7 +59,7 @@ Tool Descriptions:
 {tools}
 
 Response Format:
-Question: {input}
+Question: [The user's question, given at the end]
 Thought: [Brief explanation of search strategy]
 Action: [Tool name]
 Action Input: [Clear search parameters or None]
@@ -107,11 +83,49 @@ Start now:
 Question: {input}
 {agent_scratchpad}""")
 
+
+def create_rag_agent(
+    llm,
+    embedder: Embedder,
+    vector_store: VectorStore,
+    reranker: Optional["Reranker"] = None
+) -> AgentExecutor:
+    """Initializes and returns a ReAct agent for document interaction.
+
+    Creates an efficient agent that aims to provide answers in a single iteration
+    when possible, using a custom prompt that encourages direct responses.
+
+    Args:
+        llm: An initialized LangChain compatible language model instance.
+        embedder: An instance of the Embedder class for vectorizing queries.
+        vector_store: An instance of the VectorStore class for document retrieval.
+        reranker: An optional Reranker that narrows the retrieved chunks
+            before they are passed to the LLM.
+
+    Returns:
+        An AgentExecutor instance optimized for direct responses.
+
+    Raises:
+        ValueError: If the prompt template is missing required variables.
+    """
+    # Initialize tools with clear, focused descriptions
+    tools = [
+        KnowledgeSearchTool(
+            llm=llm,
+            embedder=embedder,
+            vector_store=vector_store,
+            reranker=reranker
+        ),
+        WipeVectorStoreTool(
+            vector_store=vector_store
+        )
+    ]
+
     # Create the agent with React structure and smart iteration
     agent = create_react_agent(
         llm=llm,
         tools=tools,
-        prompt=prompt,
+        prompt=REACT_PROMPT,
     )
 
     agent_executor = AgentExecutor(
@@ -4,17 +4,56 @@ can use to perform its tasks. This includes searching the knowledge base and
 performing administrative actions like clearing the vector store.
 """
 
+import asyncio
+import re
+import threading
 from typing import List, Optional, Type
-from pydantic import BaseModel
+from cachetools import TTLCache
+from pydantic import BaseModel, PrivateAttr
 from langchain.tools import BaseTool
 from langchain.chains import LLMChain
 from langchain_core.prompts import PromptTemplate
 from app.models.llm import get_llm
-from app.schemas import KnowledgeSearchInput
+from app.schemas import KNOWLEDGE_SEARCH_SCHEMA, KnowledgeSearchInput
 from app.core.vector_store import VectorStore
 from app.models.embedder import Embedder
 
 
+# Matches the document IDs handed out by the upload endpoint: the SHA-256 of
+# the file's content, or a UUID for documents ingested before that change.
+DOC_ID_PATTERN = re.compile(
+    r"\b(?:[0-9a-f]{64}|[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12})\b",
+    re.IGNORECASE
+)
+
+# _format_response adds the "Based on the documents:" prefix and the sources
+# itself. The answer prompt asks for the bare answer; these only catch an LLM
+# that adds the framing anyway, and the sources pattern matches nothing but a
+# trailing block of "- Document ..." citation lines.
+ANSWER_PREFIX_PATTERN = re.compile(r"^\s*based on the documents:\s*", re.IGNORECASE)
+SOURCES_BLOCK_PATTERN = re.compile(
+    r"\n\s*sources:\s*(?:\n?[ \t]*-[ \t]*document\b[^\n]*)+\s*\Z", re.IGNORECASE
+)
+
+ANSWER_PROMPT = PromptTemplate.from_template("""You are a precise and thorough assistant. Analyze and answer using ONLY the provided context.
+
+Context:
+{context}
+
+Question: {question}
+
+Instructions:
+1. Provide a clear, detailed answer based only on the context
+2. If no relevant information is found, respond EXACTLY with:
+   "No relevant information found in the documents."
+3. If information is found, respond with the answer text only. Do not
+   start with "Based on the documents:" and do not list sources; the
+   citations are attached to your answer automatically.
+
+Response:
+""")
+
+
 class KnowledgeSearchTool(BaseTool):
     """A tool for searching and synthesizing information from the PDF knowledge base."""
     name: str = "knowledge_base_search"
@@ -30,24 +69,131 @@ class KnowledgeSearchTool(BaseTool):
     vector_store: VectorStore
     embedder: Embedder
     llm: object
+    # An app.models.reranker.Reranker or None, typed loosely like `llm` so the
+    # reranker's heavy dependencies are never imported just to declare it.
+    reranker: Optional[object] = None
+
+    _retrieval_cache: TTLCache = PrivateAttr(default_factory=lambda: TTLCache(maxsize=256, ttl=60))
+    _retrieval_cache_lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+    _chain: object = PrivateAttr(default=None)
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         if not self.llm:
             self.llm = get_llm()
+        # Build the answer chain once instead of on every query
+        self._chain = ANSWER_PROMPT | self.llm
+
+    @property
+    def args(self) -> dict:
+        """Returns the tool's argument schema, generated once at import time."""
+        return KNOWLEDGE_SEARCH_SCHEMA["properties"]
 
     def format_sources(self, sources: List[dict]) -> str:
         """Formats the source citations in a clean, readable way with deduplication."""
-        # Create a set of tuples to deduplicate sources
-        unique_sources = {(source['doc_id'], source['page']) for source in sources}
-        # Convert back to sorted list for consistent output
+        # dict.fromkeys deduplicates while keeping the sources in relevance order
+        unique_sources = dict.fromkeys((source['doc_id'], source['page']) for source in sources)
         formatted_sources = [
             f"- Document {doc_id}, Page {page}"
-            for doc_id, page in sorted(unique_sources)
+            for doc_id, page in unique_sources
         ]
         return "\n".join(formatted_sources) if formatted_sources else "No sources available"
 
-    def _run(self, query: str, doc_ids: Optional[List[str]] = None, top_k: int = 10) -> str:
+    def _retrieval_key(self, query: str, doc_ids: Optional[List[str]], top_k: int) -> tuple:
+        """Builds the retrieval cache key, scoped to the vector store's version."""
+        return (self.vector_store.version, query, tuple(doc_ids or ()), top_k)
+
+    def _get_cached(self, key: tuple) -> Optional[list[dict]]:
+        with self._retrieval_cache_lock:
+            return self._retrieval_cache.get(key)
+
+    def _set_cached(self, key: tuple, chunks: list[dict]):
+        with self._retrieval_cache_lock:
+            self._retrieval_cache[key] = chunks
+
+    def _retrieve(self, query: str, doc_ids: Optional[List[str]], top_k: int) -> list[dict]:
+        """Retrieves the chunks for a query, reusing recent identical searches.
+
+        Results are cached for a short time, keyed on the vector store's
+        version so any write to the store invalidates them. This lets the
+        agent retry the same search without paying for the embedding and the
+        similarity search again. A blank query restricted to specific
+        documents is served straight from the store by document ID, since a
+        similarity score against an empty query is meaningless.
+        """
+        key = self._retrieval_key(query, doc_ids, top_k)
+        chunks = self._get_cached(key)
+        if chunks is None:
+            if not query and doc_ids:
+                chunks = self.vector_store.get_by_doc_ids(doc_ids, limit=top_k)
+            else:
+                query_embedding = self.embedder.embed_query(query or " ")
+                chunks = self.vector_store.query(query_embedding, doc_ids=doc_ids, top_k=top_k)
+                chunks = self._rerank(query, chunks)
+            self._set_cached(key, chunks)
+        return chunks
+
+    async def _aretrieve(self, query: str, doc_ids: Optional[List[str]], top_k: int) -> list[dict]:
+        """Asynchronous counterpart of `_retrieve` that never blocks the event loop."""
+        key = self._retrieval_key(query, doc_ids, top_k)
+        chunks = self._get_cached(key)
+        if chunks is None:
+            if not query and doc_ids:
+                chunks = await asyncio.to_thread(self.vector_store.get_by_doc_ids, doc_ids, top_k)
+            else:
+                query_embedding = await self.embedder.aembed_query(query or " ")
+                chunks = await asyncio.to_thread(self.vector_store.query, query_embedding, doc_ids, top_k)
+                if self.reranker:
+                    chunks = await asyncio.to_thread(self._rerank, query, chunks)
+            self._set_cached(key, chunks)
+        return chunks
+
+    def _rerank(self, query: str, chunks: list[dict]) -> list[dict]:
+        """Narrows the retrieved chunks with the reranker, if one is configured."""
+        if not self.reranker or not query:
+            return chunks
+        return self.reranker.rerank(query, chunks)
+
+    @staticmethod
+    def _resolve_doc_id_query(query: str, doc_ids: Optional[List[str]]) -> tuple[str, Optional[List[str]]]:
+        """Turns a query that is just a document ID into a whole-document request."""
+        if query and DOC_ID_PATTERN.fullmatch(query.strip()):
+            return "", [query.strip()]
+        return query, doc_ids
+
+    @staticmethod
+    def _chain_inputs(query: str, chunks: list[dict]) -> dict:
+        """Builds the answer prompt's inputs from the retrieved chunks."""
+        return {
+            "context": "\n\n".join([f"[Page {c['metadata']['page_number']}] {c['content']}" for c in chunks]),
+            "question": query or "Summarize the document.",
+            "sources": [
+                {"doc_id": c["metadata"]["doc_id"], "page": c["metadata"]["page_number"]}
+                for c in chunks
+            ]
+        }
+
+    def _format_response(self, response, sources_array: List[dict]) -> str:
+        """Formats the LLM's answer and its sources in the standard format."""
+        # Extract and clean up the response content
+        response_content = response.content if hasattr(response, 'content') else str(response)
+        response_content = response_content.strip()
+
+        # If no relevant info was found, return standard message
+        if "no relevant information" in response_content.lower():
+            return "No relevant information found in the documents."
+
+        # Drop the LLM's own prefix and sources so they are not repeated
+        response_content = ANSWER_PREFIX_PATTERN.sub("", response_content)
+        response_content = SOURCES_BLOCK_PATTERN.sub("", response_content).strip()
+
+        # Format the sources consistently
+        formatted_sources = self.format_sources(sources_array)
+
+        # Format the final response in the standard format
+        return f"Based on the documents: {response_content}\nSources:\n{formatted_sources}"
+
+    def _run(self, query: str, doc_ids: Optional[List[str]] = None, top_k: int = 5) -> str:
         """Executes the knowledge search.
 
         This method vectorizes the user's query, retrieves the most relevant
@@ -64,81 +210,25 @@ class KnowledgeSearchTool(BaseTool):
             A string containing the LLM-generated answer and the sources it used.
         """
         try:
-            if query and len(query) == 36 and query.count("-") == 4:
-                doc_ids = [query]
-                query = ""
-
-            query_embedding = self.embedder.embed_query(query or " ")
-            chunks = self.vector_store.query(query_embedding, doc_ids=doc_ids, top_k=top_k)
-
+            query, doc_ids = self._resolve_doc_id_query(query, doc_ids)
+            chunks = self._retrieve(query, doc_ids, top_k)
             if not chunks:
                 return "No relevant information found in the uploaded documents."
 
-            context = "\n\n".join([f"[Page {c['metadata']['page_number']}] {c['content']}" for c in chunks])
-            sources_array = [
-                {"doc_id": c["metadata"]["doc_id"], "page": c["metadata"]["page_number"]}
-                for c in chunks
-            ]
-
-            prompt = PromptTemplate.from_template("""
-                        You are a precise and thorough assistant. Analyze and answer using ONLY the provided context.
-
-                        Context:
-                        {context}
-
-                        Question: {question}
-
-                        Instructions:
-                        1. Provide a clear, detailed answer based only on the context
-                        2. If no relevant information is found, respond EXACTLY with:
-                           "No relevant information found in the documents."
-                        3. If information is found, respond EXACTLY in this format:
-                           Based on the documents: [Your detailed answer here]
-                           Sources: [List each source on a new line with exact doc_id and page]
-
-                        Current sources to cite: {sources}
-
-                        Response:
-                        """)
-            
-            # Create the chain using the new pattern
-            chain = prompt | self.llm
-            
-            # Get the LLM's response
-            response = chain.invoke({
-                "context": context,
-                "question": query or "Summarize the document.",
-                "sources": sources_array
-            })
-            
-            # Extract the content from AIMessage
-            response_content = response.content if hasattr(response, 'content') else str(response)
-            
-            # Extract and clean up the response content
-            response_content = response.content if hasattr(response, 'content') else str(response)
-            response_content = response_content.strip()
-            
-            # If no relevant info was found, return standard message
-            if not chunks or "no relevant information" in response_content.lower():
-                return "No relevant information found in the documents."
-                
-            # Format the sources consistently
-            formatted_sources = "\n".join([
-                f"- Document {source['doc_id']}, Page {source['page']}"
-                for source in sources_array
-            ])
-            
-            # Format the final response in the standard format
-            final_response = f"Based on the documents: {response_content}\nSources:\n{formatted_sources}"
-            
-            return final_response
+            inputs = self._chain_inputs(query, chunks)
+            response = self._chain.invoke(inputs)
+            return self._format_response(response, inputs["sources"])
 
         except Exception as e:
             return f"Error in knowledge search: {e}"
 
-    async def _arun(self, query: str, doc_ids: Optional[List[str]] = None, top_k: int = 10) -> str:
+    async def _arun(self, query: str, doc_ids: Optional[List[str]] = None, top_k: int = 5) -> str:
         """Asynchronously executes the knowledge search.
 
+        The query embedding and the LLM call are awaited natively and the
+        vector store lookup runs in a worker thread, so concurrent chat
+        requests do not block one another on the event loop.
+
         Args:
             query: The user's question or search term.
             doc_ids: An optional list of document IDs to restrict the search to.
@@ -147,7 +237,18 @@ class KnowledgeSearchTool(BaseTool):
         Returns:
             A string containing the LLM-generated answer and the sources it used.
         """
-        return self._run(query=query, doc_ids=doc_ids, top_k=top_k)
+        try:
+            query, doc_ids = self._resolve_doc_id_query(query, doc_ids)
+            chunks = await self._aretrieve(query, doc_ids, top_k)
+            if not chunks:
+                return "No relevant information found in the uploaded documents."
+
+            inputs = self._chain_inputs(query, chunks)
+            response = await self._chain.ainvoke(inputs)
+            return self._format_response(response, inputs["sources"])
+
+        except Exception as e:
+            return f"Error in knowledge search: {e}"
 
 
 class WipeVectorStoreTool(BaseTool):
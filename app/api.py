@@ -5,61 +5,97 @@ interacting with the system. It includes an endpoint for uploading new
 documents and an endpoint for chatting with the intelligent agent.
 """
 
+import hashlib
 import uuid
 import os
-import shutil
-from fastapi import APIRouter, HTTPException, BackgroundTasks, UploadFile, File
-from app.schemas import AgentChatRequest
-from app.services import rag_service
+import aiofiles
+import aiofiles.os
+import msgspec
+from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Request, UploadFile, File
+from fastapi.exceptions import RequestValidationError
+from app.fast_schemas import AGENT_CHAT_DECODER, AGENT_CHAT_REQUEST_SCHEMA
+from app.services import RAGService, get_rag_service
 
 router = APIRouter()
 
+UPLOAD_CHUNK_SIZE = 1 << 20  # 1 MiB
+
 @router.post("/upload", status_code=201)
-def upload_document(
+async def upload_document(
     background_tasks: BackgroundTasks,
-    file: UploadFile = File(...)
+    file: UploadFile = File(...),
+    rag_service: RAGService = Depends(get_rag_service)
 ):
     """Handles the upload of a new PDF document.
 
-    This endpoint accepts a PDF file, saves it to a temporary location,
-    and schedules a background task to process and index its content.
-    It immediately returns a unique document ID for future reference.
+    This endpoint accepts a PDF file, streams it to a temporary location in
+    large chunks without blocking the event loop, and schedules a background
+    task to process and index its content.
+    It immediately returns the document's ID, the SHA-256 of its content,
+    for future reference.
 
     Args:
         background_tasks: FastAPI dependency to run tasks after returning a response.
         file: The PDF file uploaded by the user.
+        rag_service: The shared RAG service, injected by FastAPI.
 
     Returns:
         A dictionary containing the new doc_id and a confirmation message.
     """
     temp_dir = "temp_uploads"
-    os.makedirs(temp_dir, exist_ok=True)
+    await aiofiles.os.makedirs(temp_dir, exist_ok=True)
     temp_file_path = os.path.join(temp_dir, f"{uuid.uuid4()}_{file.filename}")
     
-    with open(temp_file_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
+    # The document ID is the SHA-256 of the file, hashed while it streams to
+    # disk, so re-uploading the same PDF maps onto the already stored document.
+    file_hash = hashlib.sha256()
+    async with aiofiles.open(temp_file_path, "wb") as buffer:
+        while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+            file_hash.update(chunk)
+            await buffer.write(chunk)
     
-    doc_id = str(uuid.uuid4())
+    doc_id = file_hash.hexdigest()
     background_tasks.add_task(rag_service.process_document_background, doc_id, temp_file_path)
     
     return {"doc_id": doc_id, "message": "Document upload successful. Processing has started."}
 
-@router.post("/agent/chat")
-async def agent_chat(request: AgentChatRequest):
+@router.post(
+    "/agent/chat",
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {"application/json": {"schema": AGENT_CHAT_REQUEST_SCHEMA}},
+        }
+    },
+)
+async def agent_chat(
+    request: Request,
+    rag_service: RAGService = Depends(get_rag_service)
+):
     """Receives a question and passes it to the intelligent agent.
 
     This endpoint is the primary interface for querying the knowledge base.
     It takes a user's question, invokes the RAG agent, and returns the
-    agent's final, synthesized answer.
+    agent's final, synthesized answer. The body is decoded with msgspec
+    rather than through a Pydantic model, which keeps validation off the
+    request's critical path.
 
     Args:
-        request: A Pydantic model containing the user's question.
+        request: The incoming request, whose JSON body holds the user's question.
+        rag_service: The shared RAG service, injected by FastAPI.
 
     Returns:
         A dictionary containing the agent's final answer.
     """
     try:
-        response = await rag_service.invoke_agent(request.question)
+        chat_request = AGENT_CHAT_DECODER.decode(await request.body())
+    except msgspec.DecodeError as e:
+        # Rendered by FastAPI's standard handler, in the same shape as its own 422s
+        error_type = "value_error" if isinstance(e, msgspec.ValidationError) else "json_invalid"
+        raise RequestValidationError([{"type": error_type, "loc": ("body",), "msg": str(e), "input": None}])
+
+    try:
+        response = await rag_service.invoke_agent(chat_request.question)
         return {"answer": response['output']}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
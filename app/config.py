@@ -1,11 +1,14 @@
 """Manages application-wide configuration settings.
 
 This module uses Pydantic's BaseSettings to load configuration from environment
-variables defined in a .env file. It provides a centralized, type-safe way to
+variables defined in a .env file, exposed through the cached get_settings()
+factory. It provides a centralized, type-safe way to
 manage settings for various services like API keys, LLM parameters, and the
 vector database.
 """
 
+from functools import lru_cache
+from typing import Optional
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -13,12 +16,16 @@ class Settings(BaseSettings):
     """Defines and loads configuration settings for the application.
 
     Attributes:
-        model_config: Pydantic configuration to load from a .env file.
+        model_config: Pydantic configuration to load from a .env file. The
+            settings are immutable once loaded and unknown variables are
+            ignored.
 
         GROQ_API_KEY: API key for the Groq language model service.
         GOOGLE_API_KEY: API key for Google's Generative AI services (e.g., Gemini).
         LANGSMITH_API_KEY: API key for LangSmith tracing and observability.
 
+        LOG_LEVEL: The minimum level of log records to emit.
+
         GROQ_MODEL_NAME: The specific Groq model to use for generation.
         GROQ_TEMPERATURE: Controls the randomness of the LLM's output.
         GROQ_MAX_TOKENS: The maximum number of tokens to generate.
@@ -26,16 +33,44 @@ class Settings(BaseSettings):
         GROQ_FREQUENCY_PENALTY: Penalty for repeating tokens.
         GROQ_PRESENCE_PENALTY: Penalty for introducing new topics.
 
+        EMBEDDING_BACKEND: Which embedder to use, either 'google' or 'local'.
         EMBEDDING_MODEL_NAME: The Gemini model used for text embeddings.
+        LOCAL_EMBEDDING_MODEL_NAME: The ONNX model used by the local embedder.
+        EMBED_BATCH_SIZE: Number of chunks sent per embedding request.
+        EMBED_MAX_INFLIGHT: Maximum number of embedding requests run concurrently.
+        EMBED_CACHE_PATH: SQLite file caching chunk embeddings by content hash.
+        PIPELINE_SHARD_SIZE: Number of chunks passed between ingestion stages at once.
+        PIPELINE_QUEUE_SIZE: Number of items buffered between two ingestion stages.
+        PARSE_WORKERS: Number of processes parsing PDFs; defaults to one fewer than the CPU count.
+        RERANKER_MODEL_NAME: Optional cross-encoder used to rerank retrieved chunks.
+        RERANK_TOP_N: The number of chunks kept after reranking.
+        SEMANTIC_CACHE_THRESHOLD: Cosine similarity at which two questions share an answer.
+        SEMANTIC_CACHE_TABLES: Number of independent LSH tables used to bucket questions.
+        SEMANTIC_CACHE_BITS: Number of LSH hyperplanes per table.
+        SEMANTIC_CACHE_TTL: Seconds a cached answer stays valid. Kept short because
+            other worker processes only see new documents once it expires.
+        SPLITTER_TOKENIZER_NAME: The tokenizer used to measure chunk lengths.
+        CHUNK_SIZE_TOKENS: The maximum number of tokens per chunk.
+        CHUNK_OVERLAP_TOKENS: The number of tokens shared by consecutive chunks.
         CHROMA_PERSIST_DIR: The directory to persist the ChromaDB database.
         CHROMA_COLLECTION_NAME: The name of the collection within ChromaDB.
+        CHROMA_HNSW_M: Number of neighbor links per node in the HNSW index.
+        CHROMA_HNSW_CONSTRUCTION_EF: Candidate list size used to build the index.
+        CHROMA_HNSW_SEARCH_EF: Candidate list size used at query time.
     """
-    model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8")
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        env_file_encoding="utf-8",
+        frozen=True,
+        extra="ignore",
+    )
 
     GROQ_API_KEY: str
     GOOGLE_API_KEY: str
     LANGSMITH_API_KEY: str
 
+    LOG_LEVEL: str = "INFO"
+
     GROQ_MODEL_NAME: str = "llama3-70b-8192"
     GROQ_TEMPERATURE: float = 0.4
     GROQ_MAX_TOKENS: int = 2048
@@ -43,9 +78,39 @@ class Settings(BaseSettings):
     GROQ_FREQUENCY_PENALTY: float = 0.0
     GROQ_PRESENCE_PENALTY: float = 0.0
 
+    EMBEDDING_BACKEND: str = "google"
     EMBEDDING_MODEL_NAME: str = "models/embedding-001"
+    LOCAL_EMBEDDING_MODEL_NAME: str = "Intel/bge-small-en-v1.5-sts-int8-static-inc"
+    EMBED_BATCH_SIZE: int = 100
+    EMBED_MAX_INFLIGHT: int = 5
+    EMBED_CACHE_PATH: str = "./embedding_cache.sqlite3"
+    PIPELINE_SHARD_SIZE: int = 64
+    PIPELINE_QUEUE_SIZE: int = 2
+    PARSE_WORKERS: Optional[int] = None
+    RERANKER_MODEL_NAME: Optional[str] = None
+    RERANK_TOP_N: int = 3
+    SEMANTIC_CACHE_THRESHOLD: float = 0.95
+    SEMANTIC_CACHE_TABLES: int = 8
+    SEMANTIC_CACHE_BITS: int = 4
+    SEMANTIC_CACHE_TTL: float = 300
+    SPLITTER_TOKENIZER_NAME: str = "BAAI/bge-small-en-v1.5"
+    CHUNK_SIZE_TOKENS: int = 480
+    CHUNK_OVERLAP_TOKENS: int = 64
     CHROMA_PERSIST_DIR: str = "./chroma_db"
     CHROMA_COLLECTION_NAME: str = "pdf_rag_collection"
+    CHROMA_HNSW_M: int = 32
+    CHROMA_HNSW_CONSTRUCTION_EF: int = 200
+    CHROMA_HNSW_SEARCH_EF: int = 64
+
 
+@lru_cache
+def get_settings() -> Settings:
+    """Returns the application settings, loading them on first use.
 
-settings = Settings()
\ No newline at end of file
+    The environment and .env file are parsed and validated once per process;
+    every later call returns the same immutable Settings instance.
+
+    Returns:
+        The shared Settings instance.
+    """
+    return Settings()
\ No newline at end of file
@@ -0,0 +1,81 @@
+"""Persists chunk embeddings keyed by the hash of their content.
+
+This module provides the EmbeddingCache class, a small SQLite-backed store
+that maps (embedding model, SHA-256 of a chunk's text) to the chunk's vector.
+It lets the ingestion pipeline skip the embedding call for any chunk whose
+exact text has already been embedded with the same model, which is common
+across revisions of the same document.
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+from typing import Iterable
+import numpy as np
+
+# Stays well below SQLite's limit on the number of bound parameters.
+_MAX_HASHES_PER_QUERY = 500
+
+
+class EmbeddingCache:
+    """A persistent content-hash to embedding cache backed by SQLite."""
+
+    def __init__(self, path: str):
+        """Opens the cache database, creating it if necessary.
+
+        Args:
+            path: The location of the SQLite database file on disk.
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                "model TEXT NOT NULL, "
+                "hash BLOB NOT NULL, "
+                "vector BLOB NOT NULL, "
+                "PRIMARY KEY (model, hash))"
+            )
+
+    @staticmethod
+    def hash(text: str) -> bytes:
+        """Returns the SHA-256 digest used as the cache key for a chunk's text."""
+        return hashlib.sha256(text.encode("utf-8")).digest()
+
+    def get_many(self, model: str, hashes: list[bytes]) -> dict[bytes, np.ndarray]:
+        """Looks up the cached embeddings for a set of content hashes.
+
+        Args:
+            model: The name of the embedding model the vectors came from.
+            hashes: The content hashes to look up.
+
+        Returns:
+            A dictionary mapping each hash found in the cache to its vector.
+            Hashes that are not cached are simply absent.
+        """
+        unique_hashes = list(dict.fromkeys(hashes))
+        found = {}
+        with self._lock:
+            for i in range(0, len(unique_hashes), _MAX_HASHES_PER_QUERY):
+                batch = unique_hashes[i:i + _MAX_HASHES_PER_QUERY]
+                rows = self._conn.execute(
+                    "SELECT hash, vector FROM embeddings "
+                    f"WHERE model = ? AND hash IN ({','.join('?' * len(batch))})",
+                    [model, *batch]
+                )
+                found.update((h, np.frombuffer(vector, dtype=np.float32)) for h, vector in rows)
+        return found
+
+    def put_many(self, model: str, items: Iterable[tuple[bytes, np.ndarray | list[float]]]):
+        """Stores new embeddings, keeping any vector that is already cached.
+
+        Args:
+            model: The name of the embedding model the vectors came from.
+            items: Pairs of (content hash, embedding) to store.
+        """
+        rows = [(model, h, np.asarray(vector, dtype=np.float32).tobytes()) for h, vector in items]
+        with self._lock, self._conn:
+            self._conn.executemany("INSERT OR IGNORE INTO embeddings VALUES (?, ?, ?)", rows)
@@ -0,0 +1,36 @@
+"""Provides the process-wide HTTP client for outbound API calls.
+
+Sharing one client lets every caller reuse its pooled connections and
+multiplex concurrent requests over HTTP/2 instead of each library opening
+its own sockets. The client lives for one application lifespan: it is
+created on first use and closed and dropped on shutdown.
+"""
+
+from typing import Optional
+import httpx
+
+_shared_async_client: Optional[httpx.AsyncClient] = None
+
+
+def get_shared_async_client() -> httpx.AsyncClient:
+    """Returns the shared async client, creating it if none is open."""
+    global _shared_async_client
+    if _shared_async_client is None or _shared_async_client.is_closed:
+        _shared_async_client = httpx.AsyncClient(
+            http2=True,
+            timeout=60,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=50),
+        )
+    return _shared_async_client
+
+
+async def close_shared_client():
+    """Closes the shared client's pooled connections on shutdown.
+
+    The next call to `get_shared_async_client` creates a fresh client, so
+    a later application lifespan in the same process starts clean.
+    """
+    global _shared_async_client
+    if _shared_async_client is not None:
+        await _shared_async_client.aclose()
+        _shared_async_client = None
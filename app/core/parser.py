@@ -1,5 +1,9 @@
 import fitz
-from collections import defaultdict
+import numpy as np
+from typing import Iterator
+
+# Plain "dict" extraction flags minus embedded image data, which the parser never reads.
+TEXT_FLAGS = fitz.TEXTFLAGS_DICT & ~fitz.TEXT_PRESERVE_IMAGES
 
 class DocumentParser:
     """A context-aware PDF parser that structures content by headings.
@@ -10,66 +14,87 @@ class DocumentParser:
     simple fixed-size splitting would allow.
     """
 
-    def parse(self, file_path: str) -> list[dict]:
-        """Extracts text from a PDF, organizing it into sections.
+    def parse(self, file_path: str) -> Iterator[dict]:
+        """Extracts text from a PDF, yielding it section by section.
+
+        The whole document is read in one pass up front (the heading
+        heuristic needs the document-wide body font size); sections are then
+        yielded as soon as each heading closes, so downstream stages can
+        start working before the last section is assembled.
 
         Args:
             file_path: The local path to the PDF file to be parsed.
 
-        Returns:
-            A list of dictionaries, where each dictionary represents a
-            semantically grouped section of the document, containing the
-            page number, the identified heading, and the associated content.
-            Returns an empty list if the document contains no text.
+        Yields:
+            Dictionaries, each representing a semantically grouped section
+            of the document, containing the page number, the identified
+            heading, and the associated content. Nothing is yielded if the
+            document contains no text.
         """
-        doc = fitz.open(file_path)
-        parsed_sections = []
-        current_heading = ""
-        current_text = ""
-        page_num = 1
-        
-        font_counts = defaultdict(int)
-        for page in doc:
-            blocks = page.get_text("dict")["blocks"]
-            for block in blocks:
-                if "lines" in block:
-                    for line in block["lines"]:
-                        for span in line["spans"]:
-                            font_counts[round(span["size"])] += 1
-        
-        if not font_counts:
-            return []
-            
-        most_common_size = max(font_counts, key=font_counts.get)
-
-        for page_num, page in enumerate(doc, start=1):
-            blocks = page.get_text("dict")["blocks"]
-            for block in blocks:
-                if "lines" in block:
-                    for line in block["lines"]:
+        with fitz.open(file_path) as doc:
+            # Extract each page once, keeping only the (size, text) of every
+            # line plus all span sizes for the font histogram.
+            pages_lines = []
+            span_sizes = []
+            for page in doc:
+                lines = []
+                for block in page.get_text("dict", flags=TEXT_FLAGS)["blocks"]:
+                    for line in block.get("lines", ()):
                         spans = line["spans"]
                         if not spans: continue
+                        span_sizes.extend(span["size"] for span in spans)
+                        lines.append((
+                            round(spans[0]["size"]),
+                            "".join([span["text"] for span in spans]).strip()
+                        ))
+                pages_lines.append(lines)
+
+        if not span_sizes:
+            return
+
+        sizes = np.round(np.array(span_sizes)).astype(np.int64)
+        most_common_size = int(np.bincount(sizes).argmax())
+
+        current_heading = ""
+        current_text_parts: list[str] = []
+        page_num = 1
+
+        for page_num, lines in enumerate(pages_lines, start=1):
+            for span_size, line_text in lines:
+                if span_size > most_common_size:
+                    if current_heading or current_text_parts:
+                        yield from self._section(page_num, current_heading, current_text_parts)
+                    current_heading = line_text
+                    current_text_parts.clear()
+                else:
+                    current_text_parts.append(line_text)
 
-                        span_size = round(spans[0]["size"])
-                        line_text = "".join([span["text"] for span in spans]).strip()
-
-                        if span_size > most_common_size:
-                            if current_heading or current_text:
-                                parsed_sections.append({
-                                    "page_number": page_num,
-                                    "heading": current_heading,
-                                    "content": current_text.strip()
-                                })
-                            current_heading = line_text
-                            current_text = ""
-                        else:
-                            current_text += " " + line_text
-        
-        if current_heading or current_text:
-            parsed_sections.append({
+        if current_heading or current_text_parts:
+            yield from self._section(page_num, current_heading, current_text_parts)
+
+    @staticmethod
+    def _section(page_num: int, heading: str, text_parts: list[str]) -> Iterator[dict]:
+        """Yields the section built from the buffered lines, unless it is empty."""
+        content = " ".join(text_parts).strip()
+        if content:
+            yield {
                 "page_number": page_num,
-                "heading": current_heading,
-                "content": current_text.strip()
-            })
+                "heading": heading,
+                "content": content
+            }
+
 
-        return [sec for sec in parsed_sections if sec["content"]]
\ No newline at end of file
+def parse_document(file_path: str) -> list[dict]:
+    """Parses a PDF into its list of sections.
+
+    A module-level entry point for running the parser in a worker process:
+    only the file path and the resulting sections cross the process
+    boundary, and the parser itself is built in the child.
+
+    Args:
+        file_path: The local path to the PDF file to be parsed.
+
+    Returns:
+        The sections yielded by `DocumentParser.parse`, in document order.
+    """
+    return list(DocumentParser().parse(file_path))
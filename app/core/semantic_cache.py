@@ -0,0 +1,132 @@
+"""Caches answers for semantically equivalent questions.
+
+This module provides the SemanticCache class, an in-memory cache that maps a
+question's embedding to the response produced for it. Lookups hash the
+embedding with random-projection locality-sensitive hashing (LSH) into
+several independent tables, so that only the entries sharing a bucket with
+the question in at least one table are compared by cosine similarity. This
+lets a rephrased repeat of a recent question skip retrieval and the LLM
+call entirely.
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Optional
+import numpy as np
+
+
+class SemanticCache:
+    """An LSH-bucketed, time-limited cache of responses keyed by embedding."""
+
+    def __init__(
+        self,
+        threshold: float = 0.95,
+        n_tables: int = 8,
+        n_bits: int = 4,
+        ttl: float = 300,
+        max_entries: int = 1024,
+        seed: int = 0
+    ):
+        """Initializes an empty cache.
+
+        Args:
+            threshold: The minimum cosine similarity for a cached question
+                to count as equivalent to a new one.
+            n_tables: The number of independent hash tables. A near-duplicate
+                is found if it shares a bucket in any one of them, so more
+                tables mean fewer missed matches.
+            n_bits: The number of random hyperplanes, i.e. bits in each
+                table's bucket key. More bits mean smaller buckets and faster
+                scans, at the price of missing more near-duplicates.
+            ttl: The number of seconds an entry stays valid.
+            max_entries: The maximum number of entries kept; the oldest are
+                evicted first.
+            seed: The seed for the random projections.
+        """
+        self.threshold = threshold
+        self.n_tables = n_tables
+        self.n_bits = n_bits
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.seed = seed
+        # Built lazily, once the embedding dimension is known.
+        self._projections: Optional[np.ndarray] = None
+        self._buckets: dict[tuple[int, bytes], list[tuple]] = {}
+        self._order: deque = deque()
+        self._lock = threading.Lock()
+
+    def lookup(self, embedding: np.ndarray | list[float]) -> Optional[dict]:
+        """Returns the cached response for an equivalent question, if any.
+
+        Args:
+            embedding: The embedding of the new question.
+
+        Returns:
+            The cached response, or None on a cache miss.
+        """
+        vector = self._normalize(embedding)
+        with self._lock:
+            self._evict(time.monotonic())
+            seen = set()
+            for key in self._keys(vector):
+                for entry in self._buckets.get(key, ()):
+                    if id(entry) in seen:
+                        continue
+                    seen.add(id(entry))
+                    cached_vector, _, response = entry
+                    if float(cached_vector @ vector) >= self.threshold:
+                        return response
+        return None
+
+    def insert(self, embedding: np.ndarray | list[float], response: dict):
+        """Caches the response produced for a question.
+
+        Args:
+            embedding: The embedding of the question.
+            response: The response to return for equivalent questions.
+        """
+        vector = self._normalize(embedding)
+        now = time.monotonic()
+        with self._lock:
+            keys = self._keys(vector)
+            entry = (vector, now + self.ttl, response)
+            for key in keys:
+                self._buckets.setdefault(key, []).append(entry)
+            self._order.append((keys, entry))
+            self._evict(now)
+
+    def clear(self):
+        """Drops every cached response."""
+        with self._lock:
+            self._buckets.clear()
+            self._order.clear()
+
+    def _keys(self, vector: np.ndarray) -> list[tuple[int, bytes]]:
+        """Hashes a vector to one bucket per table: a sign bit per hyperplane."""
+        if self._projections is None:
+            rng = np.random.default_rng(self.seed)
+            self._projections = rng.standard_normal(
+                (self.n_tables, self.n_bits, vector.shape[0])
+            ).astype(np.float32)
+        bits = self._projections @ vector > 0
+        return [(table, np.packbits(table_bits).tobytes()) for table, table_bits in enumerate(bits)]
+
+    def _evict(self, now: float):
+        """Removes expired entries and, past capacity, the oldest ones.
+
+        Every entry has the same TTL, so insertion order is expiry order.
+        """
+        while self._order and (len(self._order) > self.max_entries or self._order[0][1][1] <= now):
+            keys, entry = self._order.popleft()
+            for key in keys:
+                bucket = [e for e in self._buckets[key] if e is not entry]
+                if bucket:
+                    self._buckets[key] = bucket
+                else:
+                    del self._buckets[key]
+
+    @staticmethod
+    def _normalize(embedding: np.ndarray | list[float]) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32)
+        return vector / (np.linalg.norm(vector) or 1.0)
@@ -4,7 +4,9 @@ This module provides a wrapper around LangChain's text splitting
 functionalities to break down documents into sizes suitable for embedding.
 """
 
+from typing import Iterable, Iterator
 from langchain.text_splitter import RecursiveCharacterTextSplitter
+from tokenizers import Tokenizer
 
 
 class TextSplitter:
@@ -12,44 +14,61 @@ class TextSplitter:
 
     This class is responsible for taking large sections of text, often generated
     by the DocumentParser, and splitting them into smaller, overlapping chunks.
-    This process is essential for ensuring the text segments fit within the
-    context window of embedding models.
+    Chunk lengths are measured in tokens of the embedding model's tokenizer,
+    so every chunk fits the model's context window without being silently
+    truncated or left under-packed.
     """
-    def __init__(self, chunk_size: int = 2000, chunk_overlap: int = 300):
+    def __init__(
+        self,
+        tokenizer_name: str = "BAAI/bge-small-en-v1.5",
+        chunk_size: int = 480,
+        chunk_overlap: int = 64
+    ):
         """Initializes the TextSplitter.
 
         Args:
-            chunk_size: The maximum number of characters for each chunk.
-            chunk_overlap: The number of characters to overlap between
+            tokenizer_name: The Hugging Face tokenizer used to measure chunk
+                lengths.
+            chunk_size: The maximum number of tokens for each chunk.
+            chunk_overlap: The number of tokens to overlap between
                 consecutive chunks to maintain contextual continuity.
         """
+        self.tokenizer = Tokenizer.from_pretrained(tokenizer_name)
+        # Lengths must be measured on the full text, never a truncated view.
+        self.tokenizer.no_truncation()
+        self.tokenizer.no_padding()
         self.splitter = RecursiveCharacterTextSplitter(
             chunk_size=chunk_size,
-            chunk_overlap=chunk_overlap
+            chunk_overlap=chunk_overlap,
+            length_function=self._token_length
         )
 
-    def split(self, documents: list[dict]) -> list[dict]:
-        """Splits a list of document sections into smaller chunks.
+    def _token_length(self, text: str) -> int:
+        """Returns the number of tokens in a text, excluding special tokens."""
+        return len(self.tokenizer.encode(text, add_special_tokens=False).ids)
+
+    def split(self, documents: Iterable[dict]) -> Iterator[dict]:
+        """Splits document sections into smaller chunks.
 
         This method iterates through each document section, splits its 'content'
-        field into smaller texts, and creates a new list of chunk dictionaries,
-        preserving the original page number for each new chunk.
+        field into smaller texts, and yields a chunk dictionary for each one,
+        preserving the original page number. Chunk dicts are produced lazily,
+        one section at a time, so callers never hold the whole document's
+        chunks; each section's texts are still split into a full list first,
+        since that is what the underlying LangChain splitter returns.
 
         Args:
-            documents: A list of dictionaries, where each dictionary
+            documents: An iterable of dictionaries, where each dictionary
                 represents a section of a document. Expected keys are
                 'content' and 'page_number'.
 
-        Returns:
-            A list of dictionaries, where each dictionary represents a single,
-            smaller chunk of text, ready for embedding.
+        Yields:
+            A dictionary representing a single, smaller chunk of text, ready
+            for embedding.
         """
-        chunks = []
         for doc in documents:
-            split_content = self.splitter.split_text(doc["content"])
-            for chunk in split_content:
-                chunks.append({
+            for chunk in self.splitter.split_text(doc["content"]):
+                yield {
                     "page_number": doc["page_number"],
                     "content": chunk,
-                })
-        return chunks
\ No newline at end of file
+                }
@@ -6,14 +6,42 @@ It abstracts the low-level client operations into a clean, reusable service.
 """
 
 import chromadb
-import uuid
+import numpy as np
+from functools import lru_cache
 from typing import Optional, List
+from chromadb.config import Settings as ChromaSettings
+
+# Records per upsert call; large documents are written in super-batches.
+UPSERT_BATCH_SIZE = 5000
+
+# Completion markers carry no meaningful vector, but Chroma requires one.
+_MARKER_EMBEDDING = [0.0]
+
+
+@lru_cache(maxsize=4)
+def _get_client(persist_dir: str) -> chromadb.ClientAPI:
+    """Returns a shared persistent client for a directory.
+
+    Opening a PersistentClient loads the on-disk database, so every store
+    pointed at the same directory reuses one client for the whole process.
+    """
+    return chromadb.PersistentClient(
+        path=persist_dir,
+        settings=ChromaSettings(anonymized_telemetry=False)
+    )
 
 
 class VectorStore:
     """A wrapper for ChromaDB client operations."""
 
-    def __init__(self, persist_dir: str, collection_name: str):
+    def __init__(
+        self,
+        persist_dir: str,
+        collection_name: str,
+        hnsw_m: int = 32,
+        hnsw_construction_ef: int = 200,
+        hnsw_search_ef: int = 64,
+    ):
         """Initializes the VectorStore.
 
         Args:
@@ -21,18 +49,60 @@ class VectorStore:
                 will be stored and persisted.
             collection_name: The name of the collection within ChromaDB to
                 use for storing embeddings.
+            hnsw_m: The number of bi-directional links per node in the HNSW
+                graph. Higher values improve recall at the cost of memory.
+            hnsw_construction_ef: The size of the candidate list used while
+                building the HNSW graph.
+            hnsw_search_ef: The size of the candidate list used at query
+                time; the main accuracy/speed knob for retrieval.
         """
         self.persist_dir = persist_dir
         self.collection_name = collection_name
+        self.hnsw_metadata = {
+            "hnsw:M": hnsw_m,
+            "hnsw:construction_ef": hnsw_construction_ef,
+            "hnsw:search_ef": hnsw_search_ef,
+        }
+        # Bumped on every write so callers can invalidate cached query results.
+        self.version = 0
         self._init_collection()
 
     def _init_collection(self):
-        """Initializes the persistent ChromaDB client and collection."""
-        self.client = chromadb.PersistentClient(path=self.persist_dir)
-        self.collection = self.client.get_or_create_collection(name=self.collection_name)
+        """Initializes the persistent ChromaDB client and collection.
+
+        The HNSW parameters only take effect when the collection is first
+        created; an existing collection keeps the index it was built with.
+        """
+        self.client = _get_client(self.persist_dir)
+        self.collection = self._get_or_create_collection()
+        self.ingested = self._get_or_create_ingested_collection()
+
+    def _get_or_create_collection(self):
+        """Returns the configured collection, creating it if necessary."""
+        return self.client.get_or_create_collection(
+            name=self.collection_name,
+            metadata=self.hnsw_metadata,
+        )
 
-    def add(self, doc_id: str, chunks: list[dict], embeddings: list[list[float]]):
-        """Adds document chunks and their embeddings to the Chroma collection.
+    def _get_or_create_ingested_collection(self):
+        """Returns the side collection holding one completion marker per document."""
+        return self.client.get_or_create_collection(name=f"{self.collection_name}_ingested")
+
+    def add(
+        self,
+        doc_id: str,
+        chunks: list[dict],
+        embeddings: np.ndarray | list[list[float]],
+        start_index: int = 0
+    ):
+        """Upserts document chunks and their embeddings into the Chroma collection.
+
+        Chunk IDs are derived from the document ID and the chunk's position,
+        so re-ingesting the same document overwrites the same records instead
+        of failing on duplicate IDs. The chunks are written in as few upsert
+        calls as Chroma's batch limit allows, so the SQLite transaction and
+        the HNSW index update are paid once per batch rather than per chunk.
+        PersistentClient persists every write, so no explicit flush is needed.
 
         Args:
             doc_id: The unique identifier for the source document.
@@ -40,18 +110,67 @@ class VectorStore:
                 'content' key and an optional 'page_number' key.
             embeddings: A list of vector embeddings, where each embedding
                 corresponds to a chunk in the 'chunks' list.
+            start_index: The position of the first chunk within the whole
+                document, used when a document is added in several batches.
         """
+        ids = [f"{doc_id}:{i}" for i in range(start_index, start_index + len(chunks))]
+        embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+        documents = [c.get("content", "") for c in chunks]
         metadatas = [{"doc_id": doc_id, "page_number": c.get("page_number", None)} for c in chunks]
-        self.collection.add(
-            ids=[str(uuid.uuid4()) for _ in chunks],
-            embeddings=embeddings,
-            documents=[c.get("content", "") for c in chunks],
-            metadatas=metadatas
+
+        batch_size = min(UPSERT_BATCH_SIZE, self.client.get_max_batch_size())
+        for start in range(0, len(ids), batch_size):
+            end = start + batch_size
+            self.collection.upsert(
+                ids=ids[start:end],
+                embeddings=embeddings[start:end],
+                documents=documents[start:end],
+                metadatas=metadatas[start:end]
+            )
+        self.version += 1
+
+    def has_doc(self, doc_id: str) -> bool:
+        """Checks whether a document was completely ingested.
+
+        Only a completion marker counts: chunks left behind by an ingestion
+        that never finished do not make a document present.
+
+        Args:
+            doc_id: The unique identifier for the document.
+
+        Returns:
+            True if the document's completion marker has been recorded.
+        """
+        return bool(self.ingested.get(ids=[doc_id], include=[]).get("ids"))
+
+    def mark_complete(self, doc_id: str, chunk_count: int):
+        """Records that every chunk of a document has been stored.
+
+        Must be called only after the document's last chunk is written.
+
+        Args:
+            doc_id: The unique identifier for the document.
+            chunk_count: The number of chunks stored for the document.
+        """
+        self.ingested.upsert(
+            ids=[doc_id],
+            embeddings=[_MARKER_EMBEDDING],
+            metadatas=[{"chunk_count": chunk_count}],
         )
 
+    def delete_doc(self, doc_id: str):
+        """Removes every chunk of a document and its completion marker.
+
+        Args:
+            doc_id: The unique identifier for the document to remove.
+        """
+        self.ingested.delete(ids=[doc_id])
+        self.collection.delete(where={"doc_id": doc_id})
+        self.version += 1
+
     def query(
         self,
-        query_embedding: list[float],
+        query_embedding: np.ndarray | list[float],
         doc_ids: Optional[List[str]] = None,
         top_k: int = 10
     ) -> list[dict]:
@@ -69,7 +188,7 @@ class VectorStore:
         """
         where_filter = {"doc_id": {"$in": doc_ids}} if doc_ids else {}
         results = self.collection.query(
-            query_embeddings=[query_embedding],
+            query_embeddings=np.asarray([query_embedding], dtype=np.float32),
             n_results=top_k,
             where=where_filter if where_filter else None
         )
@@ -84,6 +203,29 @@ class VectorStore:
                 })
         return retrieved_chunks
 
+    def get_by_doc_ids(self, doc_ids: List[str], limit: int = 10) -> list[dict]:
+        """Fetches chunks belonging to the given documents without a similarity search.
+
+        Args:
+            doc_ids: The document IDs whose chunks should be returned.
+            limit: The maximum number of chunks to return.
+
+        Returns:
+            A list of dictionaries in the same shape as `query` returns, each
+            containing a chunk's 'content' and 'metadata'.
+        """
+        results = self.collection.get(
+            where={"doc_id": {"$in": doc_ids}},
+            limit=limit,
+            include=["documents", "metadatas"]
+        )
+        docs_list = results.get("documents") or []
+        metadatas_list = results.get("metadatas") or [{}]*len(docs_list)
+        return [
+            {"content": doc if isinstance(doc, str) else str(doc), "metadata": metadata or {}}
+            for doc, metadata in zip(docs_list, metadatas_list)
+        ]
+
     def wipe_and_reset(self):
         """Deletes all data in the collection and re-initializes it.
 
@@ -93,10 +235,13 @@ class VectorStore:
         Returns:
             A string confirming that the collection has been wiped.
         """
-        try:
-            self.client.delete_collection(self.collection_name)
-        except Exception:
-            pass
-
-        self.collection = self.client.get_or_create_collection(name=self.collection_name)
+        for name in (self.collection_name, f"{self.collection_name}_ingested"):
+            try:
+                self.client.delete_collection(name)
+            except Exception:
+                pass
+
+        self.collection = self._get_or_create_collection()
+        self.ingested = self._get_or_create_ingested_collection()
+        self.version += 1
         return f"Collection '{self.collection_name}' wiped and re-initialized."
\ No newline at end of file
@@ -0,0 +1,22 @@
+"""Defines msgspec structs for decoding hot-path API request bodies.
+
+Request bodies that need no coercion are decoded with msgspec, which
+validates trivial payloads several times faster than Pydantic. Models that
+other libraries require to be Pydantic (such as tool argument schemas) stay
+in `app.schemas`.
+"""
+
+import msgspec
+
+
+class AgentChatRequest(msgspec.Struct):
+    """Defines the structure for a request to the agent chat endpoint."""
+    question: str
+
+
+# Decoders are reusable, so the type's decoding plan is built only once.
+AGENT_CHAT_DECODER = msgspec.json.Decoder(AgentChatRequest)
+
+# JSON schema of the request body, used to document the endpoint in OpenAPI.
+_, _components = msgspec.json.schema_components([AgentChatRequest])
+AGENT_CHAT_REQUEST_SCHEMA = _components["AgentChatRequest"]
@@ -0,0 +1,44 @@
+"""Configures application-wide logging.
+
+Log records are handed to a QueueHandler and written to stderr by a
+QueueListener on a background thread, so code on hot paths (such as the
+ingestion pipeline) never blocks on a synchronous write to the console.
+"""
+
+import logging
+import logging.handlers
+import queue
+from typing import Optional
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def setup_logging(level: str = "INFO"):
+    """Routes the root logger through a background queue listener.
+
+    Calling this more than once has no further effect.
+
+    Args:
+        level: The minimum level of the records to emit (e.g., 'DEBUG').
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    log_queue = queue.Queue(-1)
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    _listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+
+    root = logging.getLogger()
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    root.setLevel(level)
+    _listener.start()
+
+
+def shutdown_logging():
+    """Flushes the pending records and stops the background listener."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
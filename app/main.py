@@ -5,16 +5,43 @@ It brings together the API routes defined in other modules and sets up the
 application's root endpoint for health checks.
 """
 
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
 from fastapi.responses import JSONResponse
 from app.api import router
+from app.config import get_settings
+from app.core.http import close_shared_client
 from app.exceptions import DocumentProcessingError, AgentError
+from app.logging_config import setup_logging, shutdown_logging
+from app.models.llm import get_llm
+from app.services import reset_rag_service
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Sets up process-wide resources on startup and releases them on shutdown.
+
+    The background log listener starts before the first request. On
+    shutdown, the RAG service and the cached LLM client, which hold on to
+    the shared outbound HTTP connection pool, are dropped together with the
+    pool so a later lifespan rebuilds them around a fresh one; buffered log
+    records are flushed last.
+    """
+    setup_logging(get_settings().LOG_LEVEL)
+    try:
+        yield
+    finally:
+        reset_rag_service()
+        get_llm.cache_clear()
+        await close_shared_client()
+        shutdown_logging()
 
 
 app = FastAPI(
     title="Intelligent PDF RAG API",
     description="An API with a ReAct agent for querying single or multiple documents.",
-    version="2.0.0"
+    version="2.0.0",
+    lifespan=lifespan
 )
 
 @app.exception_handler(DocumentProcessingError)
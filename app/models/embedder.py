@@ -1,48 +1,283 @@
-"""Provides the embedding model client for vectorizing text.
+"""Provides the embedding model clients for vectorizing text.
 
 This module contains the Embedder class, which serves as a wrapper around the
-Google Generative AI embedding model client from LangChain. It is responsible
-for converting text chunks and user queries into numerical vectors.
+Google Generative AI embedding model client from LangChain, and the
+LocalEmbedder class, which runs a quantized BGE model on the CPU through
+ONNX Runtime. Both are responsible for converting text chunks and user
+queries into numerical vectors.
 """
 
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+import numpy as np
+import onnxruntime as ort
+from cachetools import LRUCache
+from huggingface_hub import hf_hub_download
 from langchain_google_genai import GoogleGenerativeAIEmbeddings
-from typing import List
+from tokenizers import Tokenizer
+from typing import List, Optional
+from app.config import get_settings
+
+
+def _normalize_rows(embeddings: np.ndarray) -> np.ndarray:
+    """L2-normalizes each row of a float32 matrix in place and returns it.
+
+    Unit-length vectors make the store's L2 distance rank results exactly
+    like cosine similarity, and let callers compare them with a dot product.
+    """
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    np.divide(embeddings, norms, out=embeddings, where=norms > 0)
+    return embeddings
+
 
 class Embedder:
     """Generates vector embeddings for text using Google's Gemini model."""
 
-    def __init__(self, model_name: str, google_api_key: str):
+    def __init__(
+        self,
+        model_name: str,
+        google_api_key: str,
+        batch_size: int = 100,
+        max_workers: int = 8,
+    ):
         """Initializes the Gemini embedding model.
 
         Args:
             model_name: The specific name of the Gemini embedding model to use
                 (e.g., 'models/embedding-001').
             google_api_key: The API key for accessing Google's Generative AI services.
+            batch_size: The number of chunks sent to the API in a single request.
+            max_workers: The maximum number of batch requests kept in flight
+                at the same time.
         """
+        self.model_name = model_name
         self.model = GoogleGenerativeAIEmbeddings(
             model=model_name,
             google_api_key=google_api_key
         )
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+        self._init_query_cache()
+        self._init_pool()
+
+    def _init_pool(self):
+        """Sets up the threads that run blocking embedding calls for async callers.
+
+        The pool is sized to `max_workers`, so async callers never run more
+        embedding calls at once than the backend is configured to handle.
+        """
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="embed")
 
-    def embed_chunks(self, chunks: List[str]) -> List[List[float]]:
+    def _init_query_cache(self, maxsize: int = 1024):
+        """Sets up the LRU cache that memoizes query embeddings by query text."""
+        self._query_cache = LRUCache(maxsize=maxsize)
+        self._query_cache_lock = threading.Lock()
+
+    def embed_chunks(self, chunks: List[str], batch_size: Optional[int] = None) -> np.ndarray:
         """Creates vector embeddings for a list of text chunks.
 
+        The chunks are split into fixed-size batches which are sent to the
+        embedding API concurrently, so a large document costs a few parallel
+        waves of requests instead of one long sequence of round-trips.
+
+        Args:
+            chunks: A list of strings, where each string is a text chunk.
+            batch_size: Overrides the configured number of chunks per request.
+
+        Returns:
+            A float32 array of shape (len(chunks), dim) holding the
+            L2-normalized embedding of each chunk, row for row.
+        """
+        batch_size = batch_size or self.batch_size
+        batches = [chunks[i:i + batch_size] for i in range(0, len(chunks), batch_size)]
+        if len(batches) <= 1:
+            return self._collect_batches(len(chunks), map(self._embed_documents, batches))
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(batches))) as executor:
+            return self._collect_batches(len(chunks), executor.map(self._embed_documents, batches))
+
+    @staticmethod
+    def _collect_batches(n_chunks: int, batches) -> np.ndarray:
+        """Copies per-batch results into one preallocated float32 matrix.
+
+        The matrix is allocated once the first batch reveals the embedding
+        dimension; every batch is then written into its slice, so no
+        per-chunk Python lists survive past the batch that produced them.
+        """
+        embeddings = None
+        start = 0
+        for batch in batches:
+            batch = np.asarray(batch, dtype=np.float32)
+            if embeddings is None:
+                embeddings = np.empty((n_chunks, batch.shape[1]), dtype=np.float32)
+            embeddings[start:start + len(batch)] = batch
+            start += len(batch)
+        if embeddings is None:
+            return np.empty((0, 0), dtype=np.float32)
+        return _normalize_rows(embeddings)
+
+    async def aembed_chunks(self, chunks: List[str]) -> np.ndarray:
+        """Asynchronously creates vector embeddings for a list of text chunks.
+
+        Runs `embed_chunks` on the embedder's own thread pool, so the event
+        loop is never blocked and at most `max_workers` calls run at once.
+
         Args:
             chunks: A list of strings, where each string is a text chunk.
 
         Returns:
-            A list of lists of floats, where each inner list is the vector
-            embedding for a corresponding chunk.
+            A float32 array of shape (len(chunks), dim) holding the
+            L2-normalized embedding of each chunk, row for row.
         """
-        return self.model.embed_documents(chunks)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._pool, self.embed_chunks, chunks)
+
+    def _embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embeds a single batch of texts with one request to the API."""
+        return self.model.embed_documents(texts)
 
-    def embed_query(self, query: str) -> List[float]:
+    def embed_query(self, query: str) -> np.ndarray:
         """Creates a vector embedding for a single query string.
 
+        Embeddings are memoized by query text, so an agent re-asking the same
+        question only pays for the embedding once.
+
+        Args:
+            query: The user's query text.
+
+        Returns:
+            A float32 vector holding the query's L2-normalized embedding.
+        """
+        with self._query_cache_lock:
+            embedding = self._query_cache.get(query)
+        if embedding is None:
+            embedding = self._embed_query(query)
+            with self._query_cache_lock:
+                self._query_cache[query] = embedding
+        return embedding
+
+    async def aembed_query(self, query: str) -> np.ndarray:
+        """Asynchronously creates a vector embedding for a single query string.
+
+        Shares the query cache with `embed_query`.
+
         Args:
             query: The user's query text.
 
         Returns:
-            A list of floats representing the query's vector embedding.
+            A float32 vector holding the query's L2-normalized embedding.
+        """
+        with self._query_cache_lock:
+            embedding = self._query_cache.get(query)
+        if embedding is None:
+            embedding = await self._aembed_query(query)
+            with self._query_cache_lock:
+                self._query_cache[query] = embedding
+        return embedding
+
+    def _embed_query(self, query: str) -> np.ndarray:
+        """Embeds a single query with one request to the API."""
+        return self._collect_batches(1, [[self.model.embed_query(query)]])[0]
+
+    async def _aembed_query(self, query: str) -> np.ndarray:
+        """Embeds a single query with one non-blocking request to the API."""
+        return self._collect_batches(1, [[await self.model.aembed_query(query)]])[0]
+
+
+class LocalEmbedder(Embedder):
+    """Generates vector embeddings on the CPU with a quantized ONNX BGE model.
+
+    This embedder keeps the same interface as the Gemini-backed Embedder but
+    runs the model in-process, so no embedding call pays a network round-trip.
+    Note that BGE-small produces 384-dimensional vectors, so it cannot share
+    a collection with vectors produced by a different model.
+    """
+
+    QUERY_INSTRUCTION = "Represent this sentence for searching relevant passages: "
+
+    def __init__(
+        self,
+        model_name: str,
+        onnx_file: str = "model.onnx",
+        batch_size: int = 32,
+        max_length: int = 512,
+    ):
+        """Loads the ONNX model and its tokenizer from the Hugging Face Hub.
+
+        Args:
+            model_name: The Hugging Face repository holding the ONNX export
+                (e.g., 'Intel/bge-small-en-v1.5-sts-int8-static-inc').
+            onnx_file: The name of the ONNX graph inside the repository.
+            batch_size: The number of chunks encoded in a single forward pass.
+            max_length: The maximum number of tokens per input; longer inputs
+                are truncated to fit the model's context window.
         """
-        return self.model.embed_query(query)
\ No newline at end of file
+        self.model_name = model_name
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = os.cpu_count() or 1
+        self.session = ort.InferenceSession(
+            hf_hub_download(repo_id=model_name, filename=onnx_file),
+            sess_options=options,
+            providers=["CPUExecutionProvider"],
+        )
+        self.input_names = {model_input.name for model_input in self.session.get_inputs()}
+
+        self.tokenizer = Tokenizer.from_pretrained(model_name)
+        self.tokenizer.enable_truncation(max_length=max_length)
+        self.tokenizer.enable_padding(length=None)
+
+        self.batch_size = batch_size
+        # The session already spreads each forward pass across every core.
+        self.max_workers = 1
+        self._init_query_cache()
+        self._init_pool()
+
+    def _embed_documents(self, texts: List[str]) -> np.ndarray:
+        """Runs one forward pass over a dynamically padded batch of texts."""
+        encodings = self.tokenizer.encode_batch(texts)
+        input_ids = np.array([e.ids for e in encodings], dtype=np.int64)
+        inputs = {
+            "input_ids": input_ids,
+            "attention_mask": np.array([e.attention_mask for e in encodings], dtype=np.int64),
+            "token_type_ids": np.zeros_like(input_ids),
+        }
+        last_hidden_state = self.session.run(
+            None, {name: value for name, value in inputs.items() if name in self.input_names}
+        )[0]
+
+        # BGE is trained to use the [CLS] token as the sentence representation;
+        # normalization happens once the batches are collected.
+        return last_hidden_state[:, 0]
+
+    def _embed_query(self, query: str) -> np.ndarray:
+        """Embeds a single query, prefixed with BGE's retrieval instruction."""
+        return self._collect_batches(1, [self._embed_documents([self.QUERY_INSTRUCTION + query])])[0]
+
+    async def _aembed_query(self, query: str) -> np.ndarray:
+        """Runs the forward pass in a worker thread to keep the event loop free."""
+        return await asyncio.to_thread(self._embed_query, query)
+
+
+@lru_cache(maxsize=1)
+def get_embedder() -> Embedder:
+    """Returns the process-wide embedder selected by the settings.
+
+    Building an embedder sets up an API client or loads an ONNX model, so it
+    is done once and the same instance is shared by every caller.
+
+    Returns:
+        A LocalEmbedder when EMBEDDING_BACKEND is 'local', otherwise the
+        Gemini-backed Embedder.
+    """
+    settings = get_settings()
+    if settings.EMBEDDING_BACKEND == "local":
+        return LocalEmbedder(model_name=settings.LOCAL_EMBEDDING_MODEL_NAME)
+    return Embedder(
+        model_name=settings.EMBEDDING_MODEL_NAME,
+        google_api_key=settings.GOOGLE_API_KEY,
+        batch_size=settings.EMBED_BATCH_SIZE,
+        max_workers=settings.EMBED_MAX_INFLIGHT,
+    )
\ No newline at end of file
@@ -5,21 +5,27 @@ ChatGroq language model client using settings from the application's
 central configuration.
 """
 
+from functools import lru_cache
 from langchain_groq import ChatGroq
 from pydantic import SkipValidation
-from app.config import settings
+from app.config import get_settings
+from app.core.http import get_shared_async_client
 
 
+@lru_cache(maxsize=1)
 def get_llm() -> SkipValidation[ChatGroq]:
     """Initializes and returns a configured ChatGroq LLM instance.
 
     This function reads model parameters such as the model name, temperature,
-    and API key from the global settings object and uses them to create a
-    ready-to-use instance of the ChatGroq client.
+    and API key from the shared settings object and uses them to create a
+    ready-to-use instance of the ChatGroq client. The client is created once
+    per process and shared, and its async calls go through the application's
+    shared HTTP/2 connection pool.
 
     Returns:
         A configured instance of the langchain_groq.ChatGroq class.
     """
+    settings = get_settings()
     return ChatGroq(
         model=settings.GROQ_MODEL_NAME,
         temperature=settings.GROQ_TEMPERATURE,
@@ -30,4 +36,5 @@ def get_llm() -> SkipValidation[ChatGroq]:
             "frequency_penalty": settings.GROQ_FREQUENCY_PENALTY,
             "presence_penalty": settings.GROQ_PRESENCE_PENALTY,
         },
-    )
\ No newline at end of file
+        http_async_client=get_shared_async_client(),
+    )
@@ -0,0 +1,45 @@
+"""Provides an optional cross-encoder reranker for retrieved chunks.
+
+This module contains the Reranker class, which re-scores the chunks returned
+by the vector store against the user's query with a cross-encoder model and
+keeps only the best few, so the LLM receives a smaller, more relevant context.
+"""
+
+from typing import List
+
+
+class Reranker:
+    """Re-orders retrieved chunks by cross-encoder relevance to the query."""
+
+    def __init__(self, model_name: str, top_n: int = 3):
+        """Loads the cross-encoder model.
+
+        sentence-transformers (and with it torch) is imported here rather
+        than at module level, so it is only loaded when a reranker is
+        actually configured.
+
+        Args:
+            model_name: The Hugging Face cross-encoder to use
+                (e.g., 'BAAI/bge-reranker-base').
+            top_n: The number of best-scoring chunks to keep.
+        """
+        from sentence_transformers import CrossEncoder
+
+        self.model = CrossEncoder(model_name)
+        self.top_n = top_n
+
+    def rerank(self, query: str, chunks: List[dict]) -> List[dict]:
+        """Scores each chunk against the query and keeps the best `top_n`.
+
+        Args:
+            query: The user's query text.
+            chunks: The retrieved chunks, each containing a 'content' key.
+
+        Returns:
+            The `top_n` most relevant chunks, best first.
+        """
+        if len(chunks) <= 1:
+            return chunks
+        scores = self.model.predict([(query, c["content"]) for c in chunks])
+        ranked = sorted(zip(scores, range(len(chunks))), reverse=True)
+        return [chunks[i] for _, i in ranked[:self.top_n]]
@@ -1,17 +1,13 @@
-"""Defines Pydantic models for API request and response validation.
+"""Defines Pydantic models for data validation.
 
-This module contains the data structures used by FastAPI to validate incoming
-request bodies and to structure the arguments for agent tools, ensuring that
-all data moving through the application is well-formed and type-safe.
+This module contains the data structures used to structure the arguments for
+agent tools, ensuring that all data moving through the application is
+well-formed and type-safe. Hot-path API request bodies are decoded with
+msgspec instead; see `app.fast_schemas`.
 """
 
 from typing import List, Optional
-from pydantic import BaseModel, Field
-
-
-class AgentChatRequest(BaseModel):
-    """Defines the structure for a request to the agent chat endpoint."""
-    question: str
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class KnowledgeSearchInput(BaseModel):
@@ -28,8 +24,15 @@ class KnowledgeSearchInput(BaseModel):
         top_k: The maximum number of relevant chunks to retrieve from the
             vector store.
     """
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
     query: str = Field(..., description="The natural language query to search in the uploaded documents.")
     doc_ids: Optional[List[str]] = Field(
         None, description="Optional list of specific document IDs to restrict the search. Example: ['fdeac49e-b311-4623-bdb5-57a7764736e5']"
     )
-    top_k: int = Field(10, description="Number of top relevant chunks to retrieve.")
\ No newline at end of file
+    top_k: int = Field(5, description="Number of top relevant chunks to retrieve (default 5).")
+
+
+# The tool's argument schema never changes, so it is generated once per
+# process instead of every time LangChain asks the tool for its arguments.
+KNOWLEDGE_SEARCH_SCHEMA = KnowledgeSearchInput.model_json_schema()
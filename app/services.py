@@ -5,16 +5,61 @@ initializing all core components and orchestrating the application's primary
 workflows, such as document processing and agent invocation.
 """
 
+import asyncio
+import contextlib
+import logging
+import multiprocessing
 import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Optional
+import aiofiles.os
+import numpy as np
 from app.agent.agent import create_rag_agent
-from app.core.parser import DocumentParser
+from app.agent.tools import DOC_ID_PATTERN, KnowledgeSearchTool
+from app.core.embed_cache import EmbeddingCache
+from app.core.parser import parse_document
+from app.core.semantic_cache import SemanticCache
 from app.core.splitter import TextSplitter
 from app.core.vector_store import VectorStore
-from app.models.embedder import Embedder
+from app.models.embedder import get_embedder
 from app.models.llm import get_llm
-from app.config import settings
+from app.config import get_settings
 from app.exceptions import DocumentProcessingError, AgentError
 
+log = logging.getLogger(__name__)
+
+# Questions that may need an administrative tool go through the full agent.
+ADMIN_INTENT_PATTERN = re.compile(r"\b(wipe|clear|reset|delete)\b", re.IGNORECASE)
+
+# Seconds between two progress reports while a document is being ingested.
+PROGRESS_REPORT_INTERVAL = 60
+
+
+class IngestionProgress:
+    """Tracks how far a document has moved through the ingestion pipeline."""
+
+    def __init__(self):
+        self.started_at = time.monotonic()
+        self.chunks_split = 0
+        self.chunks_stored = 0
+        self.splitting_done = False
+
+    def report(self) -> str:
+        """Summarizes the progress, with an ETA once the total is known."""
+        elapsed = time.monotonic() - self.started_at
+        rate = self.chunks_stored / elapsed if elapsed else 0.0
+        if self.splitting_done and rate:
+            eta = f"{(self.chunks_split - self.chunks_stored) / rate:.0f}s"
+        else:
+            eta = "unknown"
+        return (
+            f"{self.chunks_stored}/{self.chunks_split} chunks stored "
+            f"({rate:.1f} chunks/s, ETA {eta})"
+        )
+
 
 class RAGService:
     """The central service class for all RAG and agent operations."""
@@ -26,63 +71,316 @@ class RAGService:
         embedder, vector store), the LLM client, and creates the fully
         configured ReAct agent executor, making it ready to handle requests.
         """
-        self.parser = DocumentParser()
-        self.splitter = TextSplitter()
-        self.embedder = Embedder(
-            model_name=settings.EMBEDDING_MODEL_NAME,
-            google_api_key=settings.GOOGLE_API_KEY
+        settings = get_settings()
+        # PDF parsing is CPU-bound and holds the GIL, so it runs in separate
+        # processes; spawn avoids forking a process that already has threads.
+        self._parse_pool = ProcessPoolExecutor(
+            max_workers=settings.PARSE_WORKERS or max(1, (os.cpu_count() or 2) - 1),
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+        self.splitter = TextSplitter(
+            tokenizer_name=settings.SPLITTER_TOKENIZER_NAME,
+            chunk_size=settings.CHUNK_SIZE_TOKENS,
+            chunk_overlap=settings.CHUNK_OVERLAP_TOKENS,
         )
+        self.embedder = get_embedder()
+        self.embed_cache = EmbeddingCache(settings.EMBED_CACHE_PATH)
         self.vector_store = VectorStore(
             persist_dir=settings.CHROMA_PERSIST_DIR,
             collection_name=settings.CHROMA_COLLECTION_NAME,
+            hnsw_m=settings.CHROMA_HNSW_M,
+            hnsw_construction_ef=settings.CHROMA_HNSW_CONSTRUCTION_EF,
+            hnsw_search_ef=settings.CHROMA_HNSW_SEARCH_EF,
         )
+        reranker = None
+        if settings.RERANKER_MODEL_NAME:
+            # Imported only when configured; the reranker pulls in torch.
+            from app.models.reranker import Reranker
+
+            reranker = Reranker(model_name=settings.RERANKER_MODEL_NAME, top_n=settings.RERANK_TOP_N)
         llm_client = get_llm()
 
         self.agent_executor = create_rag_agent(
             llm=llm_client,
             embedder=self.embedder,
-            vector_store=self.vector_store
+            vector_store=self.vector_store,
+            reranker=reranker
+        )
+        self.knowledge_search_tool = next(
+            tool for tool in self.agent_executor.tools if isinstance(tool, KnowledgeSearchTool)
         )
 
-    def process_document_background(self, doc_id: str, file_path: str):
+        self.semantic_cache = SemanticCache(
+            threshold=settings.SEMANTIC_CACHE_THRESHOLD,
+            n_tables=settings.SEMANTIC_CACHE_TABLES,
+            n_bits=settings.SEMANTIC_CACHE_BITS,
+            ttl=settings.SEMANTIC_CACHE_TTL,
+        )
+        self._semantic_cache_version = self.vector_store.version
+        # Per-document ingestion locks, with the number of tasks using each.
+        self._ingest_locks: dict[str, tuple[asyncio.Lock, int]] = {}
+
+    def close(self):
+        """Shuts down the parser process pool owned by the service."""
+        self._parse_pool.shutdown(cancel_futures=True)
+
+    async def process_document_background(self, doc_id: str, file_path: str):
         """Handles the asynchronous processing of an uploaded PDF file.
 
         This method orchestrates the full ingestion pipeline: parsing text,
         splitting it into chunks, generating embeddings, and storing them in
-        the vector database. It includes debug prints for observability and
-        is designed to be run as a background task.
+        the vector database. Each step runs as its own worker and hands
+        shards of chunks to the next through small bounded queues, so one
+        shard is being stored while the next is embedded and the one after
+        that is split. It logs its progress for observability and is
+        designed to be run as a background task.
+
+        Document IDs are derived from the file's content, so a document that
+        is already in the vector store is skipped without being parsed. A
+        document only counts as present once its completion marker is
+        written after the last chunk; leftovers of an ingestion that failed
+        or was interrupted are removed before it is ingested again. Uploads
+        of the same document are ingested one at a time.
 
         Args:
             doc_id: The unique identifier for the document being processed.
             file_path: The local path to the temporary PDF file.
         """
         try:
-            print(f"\n[+] Processing doc_id: {doc_id}")
-            parsed_content = self.parser.parse(file_path)
-            chunks = self.splitter.split(parsed_content)
+            async with self._doc_lock(doc_id):
+                if await asyncio.to_thread(self.vector_store.has_doc, doc_id):
+                    log.info("Document %s already ingested; skipping", doc_id)
+                    return
+                try:
+                    # Clears chunks left by an earlier attempt that never completed
+                    await asyncio.to_thread(self.vector_store.delete_doc, doc_id)
+                    progress = await self._run_pipeline(doc_id, file_path)
+                    await asyncio.to_thread(self.vector_store.mark_complete, doc_id, progress.chunks_stored)
+                except Exception:
+                    await asyncio.to_thread(self.vector_store.delete_doc, doc_id)
+                    raise
+            log.info("Stored %d chunks in VectorStore for doc_id: %s", progress.chunks_stored, doc_id)
 
-            print(f"\n--- Generated {len(chunks)} chunks for doc_id: {doc_id} ---")
-            for i, chunk in enumerate(chunks[:3]):
-                print(f"[Chunk {i+1}] Page: {chunk.get('page_number')}, Content: {chunk['content'][:250]}...")
-            if len(chunks) > 3:
-                print(f"...and {len(chunks)-3} more chunks")
-            print("--------------------------------------------------\n")
+        except Exception as e:
+            log.exception("Error during document processing for %s: %s", doc_id, e)
+            raise DocumentProcessingError(f"Failed to process document {file_path}: {e}")
+        finally:
+            if await aiofiles.os.path.exists(file_path):
+                await aiofiles.os.remove(file_path)
 
-            chunk_contents = [chunk["content"] for chunk in chunks]
-            embeddings = self.embedder.embed_chunks(chunk_contents)
+    @contextlib.asynccontextmanager
+    async def _doc_lock(self, doc_id: str):
+        """Serializes ingestion of the same document within this process.
 
-            self.vector_store.add(doc_id, chunks, embeddings)
-            print(f"--- Stored {len(chunks)} chunks in VectorStore for doc_id: {doc_id} ---\n")
+        Locks are created on demand and dropped once nobody holds or awaits
+        them, so the registry only ever holds documents being ingested.
+        """
+        lock, users = self._ingest_locks.get(doc_id, (asyncio.Lock(), 0))
+        self._ingest_locks[doc_id] = (lock, users + 1)
+        try:
+            async with lock:
+                yield
+        finally:
+            lock, users = self._ingest_locks[doc_id]
+            if users == 1:
+                del self._ingest_locks[doc_id]
+            else:
+                self._ingest_locks[doc_id] = (lock, users - 1)
 
-        except Exception as e:
-            print(f"[-] Error during document processing for {doc_id}: {e}")
-            raise DocumentProcessingError(f"Failed to process document {file_path}: {e}")
+    async def _run_pipeline(self, doc_id: str, file_path: str) -> IngestionProgress:
+        """Runs the parse, split, embed and write stages to completion.
+
+        If any stage fails, the others are cancelled and awaited before the
+        error propagates, so no stage is still writing to the vector store
+        when the caller cleans up after the failure.
+
+        Returns:
+            The pipeline's final progress counters.
+        """
+        log.info("Processing doc_id: %s", doc_id)
+        queue_size = get_settings().PIPELINE_QUEUE_SIZE
+        sections_queue = asyncio.Queue(maxsize=queue_size)
+        chunks_queue = asyncio.Queue(maxsize=queue_size)
+        embedded_queue = asyncio.Queue(maxsize=queue_size)
+        progress = IngestionProgress()
+
+        reporter = asyncio.create_task(self._report_progress(doc_id, progress))
+        stages = [
+            asyncio.create_task(self._parse_stage(file_path, sections_queue)),
+            asyncio.create_task(self._split_stage(sections_queue, chunks_queue, progress)),
+            asyncio.create_task(self._embed_stage(chunks_queue, embedded_queue)),
+            asyncio.create_task(self._write_stage(doc_id, embedded_queue, progress)),
+        ]
+        try:
+            await asyncio.gather(*stages)
+        except BaseException:
+            for stage in stages:
+                stage.cancel()
+            await asyncio.gather(*stages, return_exceptions=True)
+            raise
         finally:
-            if os.path.exists(file_path):
-                os.remove(file_path)
+            reporter.cancel()
+        return progress
+
+    async def _parse_stage(self, file_path: str, sections_queue: asyncio.Queue):
+        """Parses the PDF and feeds its sections to the splitting stage.
+
+        Parsing runs in the parser process pool, so it uses another core and
+        never competes with the event loop for the GIL.
+        """
+        loop = asyncio.get_running_loop()
+        sections = await loop.run_in_executor(self._parse_pool, parse_document, file_path)
+        for section in sections:
+            await sections_queue.put(section)
+        await sections_queue.put(None)
+
+    async def _split_stage(
+        self,
+        sections_queue: asyncio.Queue,
+        chunks_queue: asyncio.Queue,
+        progress: IngestionProgress
+    ):
+        """Splits incoming sections into chunks and groups them into shards.
+
+        The splitter's chunk dicts are pulled a shard's worth at a time, so
+        the whole document's chunks are never held at once. The texts of a
+        single section are still split in one go, though, so memory is
+        bounded by the largest section, not by the shard size. Each shard
+        is queued together with the position of its first chunk within the
+        document and the list of its chunks' texts, which are extracted in
+        the same pass that captures the first few chunks for debug logging.
+        """
+        shard_size = get_settings().PIPELINE_SHARD_SIZE
+        debug = log.isEnabledFor(logging.DEBUG)
+        previews = []
+        shard, contents = [], []
+        while (section := await sections_queue.get()) is not None:
+            chunks = self.splitter.split((section,))
+            while pulled := await asyncio.to_thread(list, islice(chunks, shard_size - len(shard))):
+                for chunk in pulled:
+                    contents.append(chunk["content"])
+                    if debug and len(previews) < 3:
+                        previews.append((len(previews), chunk["page_number"], chunk["content"][:250]))
+                progress.chunks_split += len(pulled)
+                shard.extend(pulled)
+                if len(shard) == shard_size:
+                    await chunks_queue.put((progress.chunks_split - len(shard), shard, contents))
+                    shard, contents = [], []
+        if shard:
+            await chunks_queue.put((progress.chunks_split - len(shard), shard, contents))
+        if previews:
+            log.debug("previews=%r", previews)
+        progress.splitting_done = True
+        await chunks_queue.put(None)
+
+    async def _embed_stage(self, chunks_queue: asyncio.Queue, embedded_queue: asyncio.Queue):
+        """Embeds incoming shards and hands them to the writing stage.
+
+        Up to EMBED_MAX_INFLIGHT shards are embedded concurrently, capped by
+        the embedder's own `max_workers`, so the embedding API's latency is
+        overlapped instead of paid once per shard, while the local backend,
+        whose forward pass already uses every core, runs one at a time.
+        Shards keep their start index, so the order in which requests
+        complete does not matter.
+        """
+        inflight = asyncio.Semaphore(min(get_settings().EMBED_MAX_INFLIGHT, self.embedder.max_workers))
+
+        async def embed(start_index: int, shard: list[dict], contents: list[str]):
+            try:
+                embeddings = await self._embed_with_cache(contents)
+                await embedded_queue.put((start_index, shard, embeddings))
+            finally:
+                inflight.release()
+
+        # The task group cancels the consume loop and every other shard as soon
+        # as one shard fails, so no further embedding requests are sent.
+        try:
+            async with asyncio.TaskGroup() as group:
+                while (item := await chunks_queue.get()) is not None:
+                    # Waiting for a free slot before taking the next shard keeps
+                    # the pipeline's backpressure intact.
+                    await inflight.acquire()
+                    group.create_task(embed(*item))
+        except BaseExceptionGroup as errors:
+            # Surface the first failure itself rather than the group wrapper
+            raise errors.exceptions[0] from None
+        await embedded_queue.put(None)
+
+    async def _embed_with_cache(self, chunk_contents: list[str]) -> np.ndarray:
+        """Embeds chunks, only sending the ones missing from the embedding cache.
+
+        Chunks are looked up by the SHA-256 of their text under the current
+        embedding model; new embeddings are written back to the cache. Cached
+        and freshly computed vectors are gathered into a single preallocated
+        float32 matrix that is handed to the vector store as is.
+
+        Returns:
+            A float32 array with one embedding per chunk, in the same order
+            as `chunk_contents`.
+        """
+        model = self.embedder.model_name
+        hashes = [EmbeddingCache.hash(content) for content in chunk_contents]
+        cached = await asyncio.to_thread(self.embed_cache.get_many, model, hashes)
+
+        missing_idx = [i for i, h in enumerate(hashes) if h not in cached]
+        if missing_idx:
+            new_embeddings = await self.embedder.aembed_chunks([chunk_contents[i] for i in missing_idx])
+            await asyncio.to_thread(
+                self.embed_cache.put_many, model, zip((hashes[i] for i in missing_idx), new_embeddings)
+            )
+            dim = new_embeddings.shape[1]
+        else:
+            dim = len(next(iter(cached.values())))
+
+        embeddings = np.empty((len(hashes), dim), dtype=np.float32)
+        for i, h in enumerate(hashes):
+            if h in cached:
+                embeddings[i] = cached[h]
+        if missing_idx:
+            embeddings[missing_idx] = new_embeddings
+        return embeddings
+
+    async def _write_stage(self, doc_id: str, embedded_queue: asyncio.Queue, progress: IngestionProgress):
+        """Writes embedded shards to the vector store as they arrive.
+
+        Cancelling a `to_thread` call does not stop its thread, so on
+        cancellation the stage waits for the write in flight to land before
+        giving up; the caller's cleanup then sees every chunk written.
+        """
+        while (item := await embedded_queue.get()) is not None:
+            start_index, shard, embeddings = item
+            write = asyncio.ensure_future(
+                asyncio.to_thread(self.vector_store.add, doc_id, shard, embeddings, start_index)
+            )
+            try:
+                await asyncio.shield(write)
+            except asyncio.CancelledError:
+                await asyncio.wait({write})
+                raise
+            progress.chunks_stored += len(shard)
+
+    @staticmethod
+    async def _report_progress(doc_id: str, progress: IngestionProgress):
+        """Logs the pipeline's progress at a fixed interval until cancelled."""
+        while True:
+            await asyncio.sleep(PROGRESS_REPORT_INTERVAL)
+            log.info("Ingesting doc_id %s: %s", doc_id, progress.report())
 
     async def invoke_agent(self, question: str) -> dict:
-        """Asynchronously invokes the ReAct agent with a user's question.
+        """Asynchronously answers a user's question.
+
+        Plain knowledge questions are answered by calling the knowledge
+        search tool directly, which saves the ReAct planning round-trip to
+        the LLM. Questions that mention wiping, clearing, resetting or
+        deleting are routed through the full agent so it can pick the
+        administrative tool.
+
+        Answers to plain questions are kept in a semantic cache, so a
+        rephrased repeat of a recent question is answered from memory. The
+        cache is emptied whenever this process changes the vector store, and
+        questions about specific documents bypass it. "No relevant
+        information" answers are never cached: a document ingested by another
+        worker process could answer the question at any moment.
 
         Args:
             question: The user's input string/question for the agent.
@@ -92,12 +390,66 @@ class RAGService:
             including the final 'output' field.
         """
         try:
+            if ADMIN_INTENT_PATTERN.search(question):
+                response = await self.agent_executor.ainvoke({"input": question})
+                self.semantic_cache.clear()
+                return response
+
+            doc_ids = DOC_ID_PATTERN.findall(question) or None
+            if doc_ids:
+                answer = await self.knowledge_search_tool.ainvoke({"query": question, "doc_ids": doc_ids})
+                return {"output": answer}
 
-            response = await self.agent_executor.ainvoke({"input": question})
+            if self._semantic_cache_version != self.vector_store.version:
+                self.semantic_cache.clear()
+                self._semantic_cache_version = self.vector_store.version
+
+            question_embedding = await self.embedder.aembed_query(question)
+            response = self.semantic_cache.lookup(question_embedding)
+            if response is None:
+                answer = await self.knowledge_search_tool.ainvoke({"query": question})
+                response = {"output": answer}
+                if not (
+                    answer.startswith("Error in knowledge search")
+                    or "no relevant information" in answer.lower()
+                ):
+                    self.semantic_cache.insert(question_embedding, response)
         except Exception as e:
-            print(f"[-] Error during agent invocation: {e}")
+            log.error("Error during agent invocation: %s", e)
             raise AgentError(f"Failed to invoke agent: {e}")
         return response
 
 
-rag_service = RAGService()
\ No newline at end of file
+_rag_service: Optional[RAGService] = None
+_rag_service_lock = asyncio.Lock()
+
+
+async def get_rag_service() -> RAGService:
+    """Returns the process-wide RAGService, building it on first use.
+
+    Building the service loads models and compiles the agent, so it is
+    deferred from import time to the first request that needs it. Once it
+    exists, the dependency returns it directly on the event loop; only the
+    first build runs in a worker thread, behind a lock that keeps
+    concurrent first requests from building it twice.
+    """
+    global _rag_service
+    if _rag_service is None:
+        async with _rag_service_lock:
+            if _rag_service is None:
+                _rag_service = await asyncio.to_thread(RAGService)
+    return _rag_service
+
+
+def reset_rag_service():
+    """Shuts down the process-wide RAGService, if one was built.
+
+    Called on application shutdown, so a later lifespan in the same process
+    builds a fresh service around fresh clients.
+    """
+    global _rag_service, _rag_service_lock
+    if _rag_service is not None:
+        _rag_service.close()
+        _rag_service = None
+    # A later lifespan may run on a different event loop
+    _rag_service_lock = asyncio.Lock()